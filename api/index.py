@@ -1,12 +1,26 @@
 import os
+import base64
+import orjson
 from dotenv import load_dotenv
 import psycopg2
-from flask import Flask, request, jsonify
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
+from psycopg2.extras import RealDictCursor
+from contextlib import contextmanager
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import redis
+import msgspec
+from typing import Optional, Union
+from flask import Flask, request, jsonify, Response, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_cors import CORS
 from datetime import datetime, timedelta
 import smtplib
+import socket
 from email.mime.text import MIMEText
-import random
+import secrets
 import traceback
 import logging
 
@@ -16,55 +30,268 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()  # Load .env file for local development
 
+# Serve every jsonify() response through orjson instead of the stdlib json module
+class ORJSONProvider(JSONProvider):
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # CORS configuration with permissive settings for testing
 CORS(app, resources={r"/api/*": {"origins": ["*"], "methods": ["GET", "POST", "OPTIONS", "PUT", "DELETE"], "allow_headers": ["*"], "supports_credentials": True}})
 
+# CockroachDB CA certificate, decoded from SSL_CA and written once per process
+# so connections can verify the server without touching the filesystem again
+DB_SSL_ROOT_CERT = "/tmp/cockroachdb_ca.crt"
+
+def write_db_ca_cert():
+    ssl_ca = os.getenv("SSL_CA")
+    if not ssl_ca:
+        logger.warning("SSL_CA not set, connecting without server certificate verification")
+        return None
+    try:
+        with open(DB_SSL_ROOT_CERT, "wb") as f:
+            f.write(base64.b64decode(ssl_ca))
+        return DB_SSL_ROOT_CERT
+    except Exception as e:
+        logger.error(f"Failed to write CockroachDB CA certificate: {str(e)}")
+        return None
+
+db_ssl_root_cert = write_db_ca_cert()
+
 # CockroachDB configuration using only environment variables
-def get_db_connection():
-    conn_params = {
-        "host": os.getenv("DB_HOST"),
-        "user": os.getenv("DB_USER"),
-        "password": os.getenv("DB_PASSWORD"),
-        "database": os.getenv("DB_NAME"),
-        "port": os.getenv("DB_PORT"),
-        "sslmode": "require"
-    }
-    logger.debug(f"Connecting to DB with params: {conn_params}")
-    
+DB_POOL_MINCONN = 1
+DB_POOL_MAXCONN = 20
+# Pooled connections idle for longer than this are pinged before reuse
+DB_IDLE_PING_SECONDS = 30
+
+db_pool = None
+db_pool_lock = threading.Lock()
+
+# Hot statements are prepared once per pooled connection and run with EXECUTE,
+# so CockroachDB doesn't re-parse and re-plan them on every request
+PREPARED_STATEMENTS = {
+    "employee_email": "SELECT empemail FROM employees WHERE orgid = $1 AND empid = $2",
+    "otp_upsert": """INSERT INTO otps (key, otp, created_at) VALUES ($1, $2, $3)
+        ON CONFLICT (key) DO UPDATE SET otp = excluded.otp, created_at = excluded.created_at""",
+    "otp_consume": """DELETE FROM otps WHERE key = $1
+        RETURNING otp, created_at > now() - $2::INTERVAL""",
+    "client_exists": "SELECT 1 FROM clients WHERE orgid = $1 AND clientid = $2 LIMIT 1",
+    "note_insert": """INSERT INTO notes 
+        (orgid, empid, clientid, meetingid, datetime, audionotes, textnotes) 
+        VALUES ($1, $2, $3, nextval('notes_seq'), $4, $5, $6)""",
+    "note_update": """UPDATE notes 
+        SET textnotes = $1 
+        WHERE orgid = $2 AND empid = $3 AND clientid = $4 AND datetime = $5""",
+}
+
+class PooledConnection(psycopg2.extensions.connection):
+    prepared = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.last_used = time.monotonic()
+
+def prepare_statements(conn):
+    # All statements go out in a single round-trip
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(";\n".join(
+                f"PREPARE {name} AS {sql}" for name, sql in PREPARED_STATEMENTS.items()
+            ))
+        conn.commit()
+    except Exception:
+        # Statements prepared before the failure outlive the rollback, so this
+        # session would hit "already exists" on every retry; drop it instead
+        conn.close()
+        raise
+    conn.prepared = True
+
+def get_db_pool():
+    # The pool is created once per process and shared across requests, so the
+    # TLS handshake with CockroachDB is only paid when a new connection is opened
+    global db_pool
+    if db_pool is None:
+        with db_pool_lock:
+            if db_pool is None:
+                conn_params = {
+                    "host": os.getenv("DB_HOST"),
+                    "user": os.getenv("DB_USER"),
+                    "database": os.getenv("DB_NAME"),
+                    "port": os.getenv("DB_PORT"),
+                    "sslmode": "require",
+                    "connect_timeout": 10,
+                    "keepalives": 1,
+                    "keepalives_idle": 30,
+                    "keepalives_interval": 10,
+                    "keepalives_count": 3
+                }
+                if db_ssl_root_cert:
+                    conn_params["sslmode"] = "verify-full"
+                    conn_params["sslrootcert"] = db_ssl_root_cert
+                logger.debug(f"Creating DB connection pool with params: {conn_params}")
+                try:
+                    db_pool = ThreadedConnectionPool(
+                        DB_POOL_MINCONN,
+                        DB_POOL_MAXCONN,
+                        password=os.getenv("DB_PASSWORD"),
+                        connection_factory=PooledConnection,
+                        **conn_params
+                    )
+                    logger.debug("Database connection pool created successfully")
+                except psycopg2.Error as e:
+                    logger.error(f"Database connection failed: {str(e)}")
+                    raise
+    return db_pool
+
+def checkout_connection(pool):
+    # A connection left idle may have been dropped by a load balancer, an idle
+    # timeout or a serverless freeze. After a freeze every pooled connection is
+    # stale, so keep discarding dead ones until a ping succeeds or the pool
+    # opens a new connection (which is never idle).
+    while True:
+        conn = pool.getconn()
+        if time.monotonic() - conn.last_used <= DB_IDLE_PING_SECONDS:
+            return conn
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            logger.warning(f"Discarding stale pooled database connection: {str(e)}")
+            pool.putconn(conn, close=True)
+        except Exception:
+            pool.putconn(conn, close=True)
+            raise
+
+@contextmanager
+def db_cursor(name=None, cursor_factory=None, prepare=False):
+    # Passing a name opens a server-side cursor, which fetches rows in batches.
+    # Only callers that EXECUTE prepared statements ask for prepare=True.
+    pool = get_db_pool()
+    conn = checkout_connection(pool)
     try:
-        conn = psycopg2.connect(**conn_params)
-        logger.debug("Database connection established successfully")
-        return conn
-    except psycopg2.Error as e:
-        logger.error(f"Database connection failed: {str(e)}")
+        if prepare and not conn.prepared:
+            prepare_statements(conn)
+        with conn.cursor(name=name, cursor_factory=cursor_factory) as cursor:
+            yield cursor
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
         raise
+    finally:
+        # Broken connections are discarded instead of being handed out again
+        conn.last_used = time.monotonic()
+        pool.putconn(conn, close=bool(conn.closed))
+
+# Open and prepare one connection at cold start so the first request pays
+# neither the TLS handshake nor the PREPAREs; failures are logged and the
+# work is retried lazily by get_db_pool() and db_cursor()
+def warm_db_pool():
+    pool = get_db_pool()
+    conn = pool.getconn()
+    try:
+        prepare_statements(conn)
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+
+try:
+    warm_db_pool()
+except Exception as e:
+    logger.error(f"Failed to pre-warm database pool: {str(e)}")
 
-# Create OTPs table if not exists
+# Create OTPs table, client id sequence and lookup indexes if not exists
 def init_db():
-    conn = None
-    cursor = None
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS otps (
-                key STRING PRIMARY KEY,
-                otp STRING,
-                created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+        with db_cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS otps (
+                    key STRING PRIMARY KEY,
+                    otp STRING,
+                    created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
+                )
+            """)
+            # Client ids come from a sequence. It starts past the ids already in
+            # use and is only created once, so MAX(clientid) is never rescanned
+            # and the sequence is never moved back under concurrent nextval()s
+            cursor.execute(
+                "SELECT 1 FROM information_schema.sequences WHERE sequence_name = 'clients_seq'"
             )
-        """)
-        conn.commit()
-        logger.debug("Database initialized successfully")
+            if not cursor.fetchone():
+                cursor.execute("SELECT COALESCE(MAX(clientid), 0) + 1 FROM clients")
+                start = cursor.fetchone()[0]
+                cursor.execute("CREATE SEQUENCE IF NOT EXISTS clients_seq START WITH %s", (start,))
+            logger.debug("Database tables and sequences initialized")
+
+        # Index builds can be slow on the notes table, so they run in their
+        # own transaction and a failure here can't roll back the sequence above.
+        # notes_lookup serves the fetch_notes/update_note filter and sort;
+        # fetch_notes still reads audionotes from the primary index.
+        with db_cursor() as cursor:
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS notes_lookup
+                ON notes (orgid, empid, clientid, datetime DESC)
+                STORING (textnotes)
+            """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS employees_lookup
+                ON employees (orgid, empid)
+                STORING (empemail)
+            """)
+            logger.debug("Database initialized successfully")
     except Exception as e:
         logger.error(f"Error initializing database: {str(e)}")
         raise
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+# OTP storage. When REDIS_URL is configured OTPs live in Redis with a TTL,
+# otherwise they fall back to the otps table in CockroachDB
+OTP_TTL = timedelta(minutes=5)
+
+redis_url = os.getenv("REDIS_URL")
+redis_client = redis.Redis.from_url(redis_url, decode_responses=True) if redis_url else None
+
+def otp_redis_key(orgid, empid):
+    return f"otp:{orgid}:{empid}"
+
+# Short-lived in-process cache of positive lookups (employee emails, client
+# existence) to skip repeat DB round-trips. Misses are never cached.
+LOOKUP_CACHE_TTL = 60
+LOOKUP_CACHE_MAXSIZE = 4096
+
+lookup_cache = {}
+lookup_cache_lock = threading.Lock()
+
+def cache_get(key):
+    with lookup_cache_lock:
+        entry = lookup_cache.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if time.monotonic() >= expires_at:
+            del lookup_cache[key]
+            return None
+        return value
+
+def cache_put(key, value):
+    with lookup_cache_lock:
+        lookup_cache.pop(key, None)
+        if len(lookup_cache) >= LOOKUP_CACHE_MAXSIZE:
+            # Dicts keep insertion order, so the first key is the oldest entry
+            del lookup_cache[next(iter(lookup_cache))]
+        lookup_cache[key] = (value, time.monotonic() + LOOKUP_CACHE_TTL)
+
+# Background workers for OTP emails so requests don't wait on SMTP. Only used
+# on long-lived servers: Vercel freezes the function once the response is sent,
+# which would stall or drop a queued email, so there it is sent inline.
+# A single worker is enough since the shared SMTP session sends one email at
+# a time under smtp_lock anyway.
+EMAIL_EXECUTOR = None if os.getenv("VERCEL") else ThreadPoolExecutor(max_workers=1, thread_name_prefix="otp-email")
 
 # Delay database initialization until first request
 db_initialized = False
@@ -84,6 +311,69 @@ def initialize_database():
             logger.error(f"Failed to initialize database: {str(e)}")
             # Allow request to proceed, handle DB failure in endpoints
 
+# Request bodies, decoded and validated in one pass by msgspec. Fields are
+# snake_case here and camelCase on the wire. Non-strict decoding keeps the
+# old int() coercion of numeric strings; it doesn't turn numbers into strings,
+# so phone fields also accept ints.
+class RequestOtpBody(msgspec.Struct, rename="camel"):
+    org_id: int
+    emp_id: int
+
+class ValidateOtpBody(msgspec.Struct, rename="camel"):
+    org_id: int
+    emp_id: int
+    otp: Optional[str] = None
+
+class RegisterBody(msgspec.Struct, rename="camel"):
+    org_id: int
+    emp_id: int
+    org_name: Optional[str] = None
+    shortname: Optional[str] = None
+    address: Optional[str] = None
+    org_phone: Union[str, int, None] = None
+    org_email: Optional[str] = None
+    emp_name: Optional[str] = None
+    emp_shortname: Optional[str] = None
+    emp_phone: Union[str, int, None] = None
+    emp_email: Optional[str] = None
+
+class RegisterClientBody(msgspec.Struct, rename="camel"):
+    org_id: int
+    client_name: Optional[str] = None
+    client_shortname: Optional[str] = None
+    client_phone: Union[str, int, None] = "NA"
+    client_email: Optional[str] = None
+
+class FetchClientsBody(msgspec.Struct, rename="camel"):
+    org_id: int
+
+class SaveTranscriptionBody(msgspec.Struct, rename="camel"):
+    org_id: int
+    emp_id: int
+    client_id: int
+    transcription_text: Optional[str] = None
+    audio_data: Optional[str] = None
+
+class FetchNotesBody(msgspec.Struct, rename="camel"):
+    org_id: int
+    emp_id: int
+    client_id: int
+    selected_date: Optional[str] = None
+
+class UpdateNoteBody(msgspec.Struct, rename="camel"):
+    org_id: int
+    emp_id: int
+    client_id: int
+    date_time: Optional[str] = None
+    new_text: Optional[str] = None
+
+def parse_body(body_type):
+    return msgspec.json.decode(request.get_data(), type=body_type, strict=False)
+
+# Phone numbers are often sent as JSON numbers; store them as text either way
+def text_field(value):
+    return None if value is None else str(value)
+
 # OPTIONS handler for preflight requests
 @app.route("/api/<path:path>", methods=["OPTIONS"])
 def options_handler(path):
@@ -99,52 +389,50 @@ def options_handler(path):
 @app.route("/api/request-otp", methods=["POST"])
 def request_otp():
     logger.info("Received request-otp request")
-    conn = None
-    cursor = None
     try:
-        data = request.get_json()
-        orgid = int(data.get("orgId"))
-        empid = int(data.get("empId"))
+        body = parse_body(RequestOtpBody)
+        orgid = body.org_id
+        empid = body.emp_id
 
         if not orgid or not empid:
             logger.warning("Missing orgid or empid in request")
             return jsonify({"error": "orgid and empid are required"}), 400
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        empemail = cache_get(("empemail", orgid, empid))
+        if empemail is None:
+            with db_cursor(prepare=True) as cursor:
+                cursor.execute("EXECUTE employee_email (%s, %s)", (orgid, empid))
+                employee = cursor.fetchone()
 
-        cursor.execute(
-            "SELECT empemail FROM employees WHERE orgid = %s AND empid = %s",
-            (orgid, empid)
-        )
-        employee = cursor.fetchone()
+            if not employee:
+                logger.warning(f"No employee found for orgid={orgid}, empid={empid}")
+                return jsonify({"error": "No employee found with this orgid and empid"}), 404
 
-        if not employee:
-            logger.warning(f"No employee found for orgid={orgid}, empid={empid}")
-            return jsonify({"error": "No employee found with this orgid and empid"}), 404
+            empemail = employee[0]
+            if not empemail:
+                logger.warning(f"Employee email not found for orgid={orgid}, empid={empid}")
+                return jsonify({"error": "Employee email not found"}), 400
+            cache_put(("empemail", orgid, empid), empemail)
 
-        empemail = employee[0]
-        if not empemail:
-            logger.warning(f"Employee email not found for orgid={orgid}, empid={empid}")
-            return jsonify({"error": "Employee email not found"}), 400
-
-        otp = str(random.randint(1000, 9999))
+        otp = f"{secrets.randbelow(9000) + 1000:04d}"
         otp_key = f"{orgid}-{empid}"
 
-        created_at = datetime.utcnow()
+        if redis_client:
+            redis_client.set(otp_redis_key(orgid, empid), otp, ex=int(OTP_TTL.total_seconds()))
+        else:
+            created_at = datetime.utcnow()
 
-        cursor.execute(
-            "INSERT INTO otps (key, otp, created_at) VALUES (%s, %s, %s) ON CONFLICT (key) DO UPDATE SET otp = %s, created_at = %s",
-            (otp_key, otp, created_at, otp, created_at)
-        )
-        conn.commit()
+            with db_cursor(prepare=True) as cursor:
+                cursor.execute("EXECUTE otp_upsert (%s, %s, %s)", (otp_key, otp, created_at))
         logger.info(f"Generated OTP {otp} for {empemail}")
 
         gmail_email = os.getenv("GMAIL_EMAIL")
         gmail_app_password = os.getenv("GMAIL_APP_PASSWORD")
         if gmail_email and gmail_app_password:
-            success = send_otp_email(empemail, otp)
-            if not success:
+            if EMAIL_EXECUTOR:
+                # send_otp_email logs its own failures, so the result isn't awaited
+                EMAIL_EXECUTOR.submit(send_otp_email, empemail, otp)
+            elif not send_otp_email(empemail, otp):
                 logger.warning(f"Failed to send email to {empemail}")
                 return jsonify({
                     "message": "Failed to send OTP via email. Check the server logs for the OTP."
@@ -159,31 +447,71 @@ def request_otp():
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
 
+    except msgspec.DecodeError as e:
+        logger.warning(f"Invalid request body: {str(e)}")
+        return jsonify({"error": f"Invalid request body: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         logger.error(traceback.format_exc())
         response = jsonify({"error": f"Unexpected error: {str(e)}"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+# Persistent SMTP session shared by the email workers, recycled periodically
+SMTP_MAX_MESSAGES_PER_CONNECTION = 100
+
+smtp_conn = None
+smtp_messages_sent = 0
+smtp_lock = threading.Lock()
+
+def close_smtp_connection():
+    global smtp_conn, smtp_messages_sent
+    if smtp_conn is not None:
+        try:
+            smtp_conn.quit()
+        except Exception:
+            smtp_conn.close()
+    smtp_conn = None
+    smtp_messages_sent = 0
+
+def get_smtp_connection():
+    global smtp_conn
+    if smtp_conn is None or smtp_messages_sent >= SMTP_MAX_MESSAGES_PER_CONNECTION:
+        close_smtp_connection()
+        server = smtplib.SMTP("smtp.gmail.com", 587)
+        try:
+            server.starttls()
+            server.login(os.getenv("GMAIL_EMAIL"), os.getenv("GMAIL_APP_PASSWORD"))
+        except Exception:
+            server.close()
+            raise
+        smtp_conn = server
+    return smtp_conn
 
 # Send OTP via email
 def send_otp_email(to_email, otp):
+    global smtp_messages_sent
     try:
         msg = MIMEText(f"Your Notesmate OTP is: {otp}")
         msg["Subject"] = "Notesmate OTP Verification"
         msg["From"] = os.getenv("GMAIL_EMAIL")
         msg["To"] = to_email
 
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(os.getenv("GMAIL_EMAIL"), os.getenv("GMAIL_APP_PASSWORD"))
-            server.sendmail(os.getenv("GMAIL_EMAIL"), to_email, msg.as_string())
-            return True
+        with smtp_lock:
+            # Retry once on a fresh session if the server dropped the old one.
+            # Other SMTP errors, like a refused recipient or failed login, are
+            # raised as-is. SMTPException subclasses OSError, so the network
+            # errors are named explicitly rather than catching OSError.
+            for attempt in range(2):
+                try:
+                    server = get_smtp_connection()
+                    server.sendmail(os.getenv("GMAIL_EMAIL"), to_email, msg.as_string())
+                    smtp_messages_sent += 1
+                    return True
+                except (smtplib.SMTPServerDisconnected, ConnectionError, socket.timeout):
+                    close_smtp_connection()
+                    if attempt:
+                        raise
     except Exception as e:
         logger.error(f"Failed to send email to {to_email}: {str(e)}")
         return False
@@ -192,46 +520,45 @@ def send_otp_email(to_email, otp):
 @app.route("/api/validate-otp", methods=["POST"])
 def validate_otp():
     logger.info("Received validate-otp request")
-    conn = None
-    cursor = None
     try:
-        data = request.get_json()
-        orgid = int(data.get("orgId"))
-        empid = int(data.get("empId"))
-        entered_otp = data.get("otp")
+        body = parse_body(ValidateOtpBody)
+        orgid = body.org_id
+        empid = body.emp_id
+        entered_otp = body.otp
 
         if not orgid or not empid or not entered_otp:
             logger.warning("Missing orgid, empid, or otp in request")
             return jsonify({"error": "orgid, empid, and OTP are required"}), 400
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        otp_key = f"{orgid}-{empid}"
-        cursor.execute(
-            "SELECT otp, created_at FROM otps WHERE key = %s",
-            (otp_key,)
-        )
-        result = cursor.fetchone()
-
-        if not result:
-            logger.warning(f"No OTP found for key {otp_key}")
-            return jsonify({"error": "OTP not found or expired"}), 400
-
-        stored_otp, created_at = result
-        current_time = datetime.utcnow()
-        if current_time - created_at > timedelta(minutes=5):
-            cursor.execute("DELETE FROM otps WHERE key = %s", (otp_key,))
-            conn.commit()
-            logger.warning(f"OTP expired for key {otp_key}")
-            return jsonify({"error": "OTP expired"}), 400
-
-        if stored_otp != entered_otp:
-            logger.warning(f"Invalid OTP entered for key {otp_key}")
-            return jsonify({"error": "Invalid OTP"}), 400
-
-        cursor.execute("DELETE FROM otps WHERE key = %s", (otp_key,))
-        conn.commit()
+        if redis_client:
+            # GETDEL makes each OTP single-use; expiry is handled by the key TTL
+            stored_otp = redis_client.getdel(otp_redis_key(orgid, empid))
+            if stored_otp is None:
+                logger.warning(f"No OTP found for orgid={orgid}, empid={empid}")
+                return jsonify({"error": "OTP not found or expired"}), 400
+            if stored_otp != entered_otp:
+                logger.warning(f"Invalid OTP entered for orgid={orgid}, empid={empid}")
+                return jsonify({"error": "Invalid OTP"}), 400
+        else:
+            # One DELETE ... RETURNING consumes the OTP whether or not it matches,
+            # which also stops repeated guesses against the same code
+            otp_key = f"{orgid}-{empid}"
+            with db_cursor(prepare=True) as cursor:
+                cursor.execute("EXECUTE otp_consume (%s, %s)", (otp_key, OTP_TTL))
+                result = cursor.fetchone()
+
+            if not result:
+                logger.warning(f"No OTP found for key {otp_key}")
+                return jsonify({"error": "OTP not found or expired"}), 400
+
+            stored_otp, is_fresh = result
+            if not is_fresh:
+                logger.warning(f"OTP expired for key {otp_key}")
+                return jsonify({"error": "OTP expired"}), 400
+
+            if stored_otp != entered_otp:
+                logger.warning(f"Invalid OTP entered for key {otp_key}")
+                return jsonify({"error": "Invalid OTP"}), 400
 
         response = jsonify({
             "message": "OTP validated successfully",
@@ -241,129 +568,108 @@ def validate_otp():
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
 
+    except msgspec.DecodeError as e:
+        logger.warning(f"Invalid request body: {str(e)}")
+        return jsonify({"error": f"Invalid request body: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         logger.error(traceback.format_exc())
         response = jsonify({"error": f"Unexpected error: {str(e)}"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 # Register new user
 @app.route("/api/register", methods=["POST"])
 def register():
     logger.info("Received register request")
-    conn = None
-    cursor = None
     try:
-        data = request.get_json()
-        orgid = int(data.get("orgId"))
-        orgname = data.get("orgName")
-        shortname = data.get("shortname")
-        address = data.get("address")
-        phone = data.get("orgPhone")
-        email = data.get("orgEmail")
-        empid = int(data.get("empId"))
-        empname = data.get("empName")
-        empshortname = data.get("empShortname")
-        empphone = data.get("empPhone")
-        empemail = data.get("empEmail")
+        body = parse_body(RegisterBody)
+        orgid = body.org_id
+        orgname = body.org_name
+        shortname = body.shortname
+        address = body.address
+        phone = text_field(body.org_phone)
+        email = body.org_email
+        empid = body.emp_id
+        empname = body.emp_name
+        empshortname = body.emp_shortname
+        empphone = text_field(body.emp_phone)
+        empemail = body.emp_email
 
         if not all([orgid, orgname, shortname, address, phone, email, empid, empname, empshortname, empphone, empemail]):
             logger.warning("Missing required fields in register request")
             return jsonify({"error": "All fields are required"}), 400
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM organizations WHERE orgid = %s", (orgid,))
-        org_exists = cursor.fetchone()
-
-        if not org_exists:
+        with db_cursor() as cursor:
+            # Both inserts go out in one round-trip; only the employee insert's
+            # RETURNING row is read back, so no row means a duplicate employee
             cursor.execute(
                 """INSERT INTO organizations 
                 (orgid, orgname, shortname, address, phone, email) 
-                VALUES (%s, %s, %s, %s, %s, %s)""",
-                (orgid, orgname, shortname, address, phone, email)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (orgid) DO NOTHING;
+                INSERT INTO employees 
+                (empid, orgid, empname, empshortname, empphone, empemail) 
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT (orgid, empid) DO NOTHING
+                RETURNING empid""",
+                (orgid, orgname, shortname, address, phone, email,
+                 empid, orgid, empname, empshortname, empphone, empemail)
             )
+            if cursor.fetchone() is None:
+                # Undo the organization insert so a failed registration
+                # never leaves a partial one behind
+                cursor.connection.rollback()
+                logger.warning(f"Employee with empid={empid} already exists in orgid={orgid}")
+                return jsonify({"error": "Employee with this empid already exists in this organization"}), 400
 
-        cursor.execute("SELECT * FROM employees WHERE orgid = %s AND empid = %s", (orgid, empid))
-        if cursor.fetchone():
-            logger.warning(f"Employee with empid={empid} already exists in orgid={orgid}")
-            return jsonify({"error": "Employee with this empid already exists in this organization"}), 400
-
-        cursor.execute(
-            """INSERT INTO employees 
-            (empid, orgid, empname, empshortname, empphone, empemail) 
-            VALUES (%s, %s, %s, %s, %s, %s)""",
-            (empid, orgid, empname, empshortname, empphone, empemail)
-        )
-
-        conn.commit()
         response = jsonify({"message": "Registration successful"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
 
+    except msgspec.DecodeError as e:
+        logger.warning(f"Invalid request body: {str(e)}")
+        return jsonify({"error": f"Invalid request body: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         logger.error(traceback.format_exc())
         response = jsonify({"error": f"Unexpected error: {str(e)}"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 # Register new client
 @app.route("/api/register-client", methods=["POST"])
 def register_client():
     logger.info("Received register-client request")
-    conn = None
-    cursor = None
     try:
-        data = request.get_json()
-        orgid = int(data.get("orgId"))
-        clientname = data.get("clientName")
-        clientshortname = data.get("clientShortname")
-        clientphone = data.get("clientPhone", "NA")
-        clientemail = data.get("clientEmail")
+        body = parse_body(RegisterClientBody)
+        orgid = body.org_id
+        clientname = body.client_name
+        clientshortname = body.client_shortname
+        clientphone = text_field(body.client_phone)
+        clientemail = body.client_email
 
         if not all([orgid, clientname, clientemail]):
             logger.warning("Missing required fields in register-client request")
             return jsonify({"error": "orgid, clientname, and clientemail are required"}), 400
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT * FROM organizations WHERE orgid = %s", (orgid,))
-        org_exists = cursor.fetchone()
-        if not org_exists:
-            logger.warning(f"Organization not found for orgid={orgid}")
-            return jsonify({"error": "Organization not found"}), 404
-
-        cursor.execute("SELECT MAX(clientid) FROM clients WHERE orgid = %s", (orgid,))
-        result = cursor.fetchone()
-        new_clientid = (result[0] or 0) + 1
-
-        cursor.execute("SELECT * FROM clients WHERE orgid = %s AND clientid = %s", (orgid, new_clientid))
-        if cursor.fetchone():
-            logger.warning(f"Client with clientid={new_clientid} already exists in orgid={orgid}")
-            return jsonify({"error": "Client with this clientid already exists in this organization"}), 400
-
-        cursor.execute(
-            """INSERT INTO clients 
-            (clientid, orgid, clientname, clientshortname, clientphone, clientemail) 
-            VALUES (%s, %s, %s, %s, %s, %s)""",
-            (new_clientid, orgid, clientname, clientshortname, clientphone, clientemail)
-        )
+        with db_cursor() as cursor:
+            # The organization check is folded into the insert, so no row back
+            # means the organization doesn't exist
+            cursor.execute(
+                """INSERT INTO clients 
+                (clientid, orgid, clientname, clientshortname, clientphone, clientemail) 
+                SELECT nextval('clients_seq'), %s, %s, %s, %s, %s
+                WHERE EXISTS (SELECT 1 FROM organizations WHERE orgid = %s)
+                RETURNING clientid""",
+                (orgid, clientname, clientshortname, clientphone, clientemail, orgid)
+            )
+            result = cursor.fetchone()
+            if not result:
+                logger.warning(f"Organization not found for orgid={orgid}")
+                return jsonify({"error": "Organization not found"}), 404
+            new_clientid = result[0]
 
-        conn.commit()
         response = jsonify({
             "message": "Client registered successfully",
             "clientId": new_clientid
@@ -371,143 +677,135 @@ def register_client():
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
 
+    except msgspec.DecodeError as e:
+        logger.warning(f"Invalid request body: {str(e)}")
+        return jsonify({"error": f"Invalid request body: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         logger.error(traceback.format_exc())
         response = jsonify({"error": f"Unexpected error: {str(e)}"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 # Fetch clients
 @app.route("/api/fetch-clients", methods=["POST"])
 def fetch_clients():
     logger.info("Received fetch-clients request")
-    conn = None
-    cursor = None
     try:
-        data = request.get_json()
-        orgid = int(data.get("orgId"))
+        body = parse_body(FetchClientsBody)
+        orgid = body.org_id
 
         if not orgid:
             logger.warning("Missing orgid in fetch-clients request")
             return jsonify({"error": "orgid is required"}), 400
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        cursor.execute(
-            "SELECT clientid, clientname, clientshortname FROM clients WHERE orgid = %s",
-            (orgid,)
-        )
-        clients = cursor.fetchall()
-
-        client_list = [{
-            "ClientID": row[0],
-            "ClientName": row[1],
-            "ClientShortname": row[2]
-        } for row in clients]
+        # Columns are aliased to the response keys so rows can be returned as-is
+        with db_cursor(cursor_factory=RealDictCursor) as cursor:
+            cursor.execute(
+                """SELECT clientid AS "ClientID", clientname AS "ClientName", clientshortname AS "ClientShortname"
+                FROM clients WHERE orgid = %s""",
+                (orgid,)
+            )
+            client_list = cursor.fetchall()
 
         response = jsonify({"clients": client_list})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
 
+    except msgspec.DecodeError as e:
+        logger.warning(f"Invalid request body: {str(e)}")
+        return jsonify({"error": f"Invalid request body: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         logger.error(traceback.format_exc())
         response = jsonify({"error": f"Unexpected error: {str(e)}"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 # Save transcription
 @app.route("/api/save-transcription", methods=["POST"])
 def save_transcription():
     logger.info("Received save-transcription request")
-    conn = None
-    cursor = None
     try:
-        data = request.get_json()
-        orgid = int(data.get("orgId"))
-        empid = int(data.get("empId"))
-        clientid = int(data.get("clientId"))
-        transcriptiontext = data.get("transcriptionText")
-        audionotes = data.get("audioData")
+        if request.mimetype == "multipart/form-data":
+            # Audio sent as a raw file part skips the base64 inflation and decode
+            body = msgspec.convert(request.form.to_dict(), type=SaveTranscriptionBody, strict=False)
+            audio_file = request.files.get("audio")
+            audio_binary = audio_file.read() if audio_file else None
+        else:
+            body = parse_body(SaveTranscriptionBody)
+            audio_binary = base64.b64decode(body.audio_data) if body.audio_data else None
+        orgid = body.org_id
+        empid = body.emp_id
+        clientid = body.client_id
+        transcriptiontext = body.transcription_text
 
         if not all([orgid, empid, clientid, transcriptiontext]):
             logger.warning("Missing required fields in save-transcription request")
             return jsonify({"error": "orgid, empid, clientid, and transcriptiontext are required"}), 400
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with db_cursor(prepare=True) as cursor:
+            if not cache_get(("client", orgid, clientid)):
+                cursor.execute("EXECUTE client_exists (%s, %s)", (orgid, clientid))
+                if not cursor.fetchone():
+                    logger.warning(f"Invalid clientid={clientid} for orgid={orgid}")
+                    return jsonify({"error": "Invalid clientid for this organization"}), 404
+                cache_put(("client", orgid, clientid), True)
 
-        cursor.execute(
-            "SELECT * FROM clients WHERE orgid = %s AND clientid = %s",
-            (orgid, clientid)
-        )
-        if not cursor.fetchone():
-            logger.warning(f"Invalid clientid={clientid} for orgid={orgid}")
-            return jsonify({"error": "Invalid clientid for this organization"}), 404
-
-        audio_binary = None
-        if audionotes:
-            import base64
-            audio_binary = base64.b64decode(audionotes)
-
-        created_at = datetime.utcnow()
-
-        cursor.execute(
-            """INSERT INTO notes 
-            (orgid, empid, clientid, meetingid, datetime, audionotes, textnotes) 
-            VALUES (%s, %s, %s, nextval('notes_seq'), %s, %s, %s)""",
-            (orgid, empid, clientid, created_at, psycopg2.Binary(audio_binary) if audio_binary else None, transcriptiontext)
-        )
+            created_at = datetime.utcnow()
+
+            cursor.execute(
+                "EXECUTE note_insert (%s, %s, %s, %s, %s, %s)",
+                (orgid, empid, clientid, created_at, psycopg2.Binary(audio_binary) if audio_binary else None, transcriptiontext)
+            )
 
-        conn.commit()
         response = jsonify({"message": "Transcription saved successfully"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
 
+    except msgspec.DecodeError as e:
+        logger.warning(f"Invalid request body: {str(e)}")
+        return jsonify({"error": f"Invalid request body: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         logger.error(traceback.format_exc())
         response = jsonify({"error": f"Unexpected error: {str(e)}"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
+
+# Stream notes as a JSON document, encoding one row at a time so large audio
+# blobs are never all held in memory together
+NOTES_FETCH_SIZE = 100
+
+def stream_notes(query, params):
+    with db_cursor(name="fetch_notes") as cursor:
+        cursor.itersize = NOTES_FETCH_SIZE
+        cursor.execute(query, params)
+        yield b'{"notes": ['
+        for i, row in enumerate(cursor):
+            note = orjson.dumps({
+                "DateTime": row[0].strftime('%Y-%m-%dT%H:%M:%S.%f'),
+                "TextNotes": row[1],
+                "AudioNotes": base64.b64encode(row[2]).decode("utf-8") if row[2] else None
+            })
+            yield b"," + note if i else note
+        yield b"]}"
 
 # Fetch notes
 @app.route("/api/fetch-notes", methods=["POST"])
 def fetch_notes():
     logger.info("Received fetch-notes request")
-    conn = None
-    cursor = None
     try:
-        data = request.get_json()
-        orgid = int(data.get("orgId"))
-        empid = int(data.get("empId"))
-        clientid = int(data.get("clientId"))
-        selecteddate = data.get("selectedDate")
+        body = parse_body(FetchNotesBody)
+        orgid = body.org_id
+        empid = body.emp_id
+        clientid = body.client_id
+        selecteddate = body.selected_date
 
         if not all([orgid, empid, clientid]):
             logger.warning("Missing required fields in fetch-notes request")
             return jsonify({"error": "orgid, empid, and clientid are required"}), 400
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
         query = """
             SELECT datetime, textnotes, audionotes
             FROM notes
@@ -516,86 +814,75 @@ def fetch_notes():
         params = [orgid, empid, clientid]
 
         if selecteddate:
-            query += " AND DATE(datetime) = %s"
-            params.append(selecteddate)
+            # A range on the raw column lets the notes_lookup index be used
+            query += " AND datetime >= %s::DATE AND datetime < %s::DATE + INTERVAL '1 day'"
+            params.extend([selecteddate, selecteddate])
 
         query += " ORDER BY datetime DESC"
-        cursor.execute(query, params)
-        notes = cursor.fetchall()
 
-        import base64
-        note_list = [{
-            "DateTime": row[0].strftime('%Y-%m-%dT%H:%M:%S.%f'),
-            "TextNotes": row[1],
-            "AudioNotes": base64.b64encode(row[2]).decode("utf-8") if row[2] else None
-        } for row in notes]
+        chunks = stream_notes(query, params)
+        # Pull the opening chunk here so query errors still produce a 500
+        head = next(chunks)
+
+        def generate():
+            yield head
+            yield from chunks
 
-        response = jsonify({"notes": note_list})
+        response = Response(stream_with_context(generate()), mimetype="application/json")
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
 
+    except msgspec.DecodeError as e:
+        logger.warning(f"Invalid request body: {str(e)}")
+        return jsonify({"error": f"Invalid request body: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         logger.error(traceback.format_exc())
         response = jsonify({"error": f"Unexpected error: {str(e)}"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 # Update note transcription
 @app.route("/api/update-note", methods=["POST"])
 def update_note():
     logger.info("Received update-note request")
-    conn = None
-    cursor = None
     try:
-        data = request.get_json()
-        orgid = int(data.get("orgId"))
-        empid = int(data.get("empId"))
-        clientid = int(data.get("clientId"))
-        dateTime = data.get("dateTime")
-        newText = data.get("newText")
+        body = parse_body(UpdateNoteBody)
+        orgid = body.org_id
+        empid = body.emp_id
+        clientid = body.client_id
+        dateTime = body.date_time
+        newText = body.new_text
 
         if not all([orgid, empid, clientid, dateTime, newText]):
             logger.warning("Missing required fields in update-note request")
             return jsonify({"error": "orgid, empid, clientid, dateTime, and newText are required"}), 400
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        dt = datetime.strptime(dateTime, '%Y-%m-%dT%H:%M:%S.%f')
+        with db_cursor(prepare=True) as cursor:
+            dt = datetime.strptime(dateTime, '%Y-%m-%dT%H:%M:%S.%f')
 
-        cursor.execute(
-            """UPDATE notes 
-            SET textnotes = %s 
-            WHERE orgid = %s AND empid = %s AND clientid = %s AND datetime = %s""",
-            (newText, orgid, empid, clientid, dt)
-        )
-        if cursor.rowcount == 0:
-            logger.warning(f"No note found to update with datetime={dt}")
-            return jsonify({"error": "No matching note found to update"}), 404
-        conn.commit()
-        logger.info(f"Successfully updated note with datetime={dt}")
+            cursor.execute(
+                "EXECUTE note_update (%s, %s, %s, %s, %s)",
+                (newText, orgid, empid, clientid, dt)
+            )
+            if cursor.rowcount == 0:
+                logger.warning(f"No note found to update with datetime={dt}")
+                return jsonify({"error": "No matching note found to update"}), 404
+            logger.info(f"Successfully updated note with datetime={dt}")
 
         response = jsonify({"message": "Transcription updated successfully"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 200
 
+    except msgspec.DecodeError as e:
+        logger.warning(f"Invalid request body: {str(e)}")
+        return jsonify({"error": f"Invalid request body: {str(e)}"}), 400
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         logger.error(traceback.format_exc())
         response = jsonify({"error": f"Unexpected error: {str(e)}"})
         response.headers.add("Access-Control-Allow-Origin", "*")
         return response, 500
-    finally:
-        if cursor:
-            cursor.close()
-        if conn:
-            conn.close()
 
 # Default route
 @app.route("/")
@@ -607,7 +894,6 @@ def index():
 
 # Custom Vercel handler for serverless deployment
 def vercel_handler(request):
-    from flask import Response
     with app.app_context():
         response = app.full_dispatch_request()
         return Response(